@@ -78,20 +78,43 @@ class BaseCommand:
         """Get the sharepoint client instance for the running command."""
         return SharePoint(self.config, self.logger)
 
-    @staticmethod
-    def producer(thread_count, func, args, items, wait=False):
+    @cached_property
+    def producer_executor(self):
+        """Get the thread pool shared by all the producer calls of the running command,
+        so that the threads are started once instead of for every stage of every collection"""
+        return ThreadPoolExecutor(max_workers=self.config.get_value("sharepoint_sync_thread_count"))
+
+    @cached_property
+    def attachment_executor(self):
+        """Get the thread pool fetching the attachments of the running command. It is separate from the
+        producer thread pool, as the producer threads wait for the attachments they submit"""
+        return ThreadPoolExecutor(max_workers=self.config.get_value("sharepoint_sync_thread_count"))
+
+    def create_shared_objects(self):
+        """Creates the objects shared by the threads of the running command before starting them.
+        cached_property does not lock, threads accessing a property for the first time at once
+        would each create their own object, e.g. a thread pool that is never shut down"""
+        for name in (
+            "config",
+            "logger",
+            "sharepoint_client",
+            "workplace_search_custom_client",
+            "producer_executor",
+            "attachment_executor",
+        ):
+            getattr(self, name)
+
+    def producer(self, func, args, items, wait=False):
         """Apply async calls using multithreading to the targeted function
-        :param thread_count: Total number of threads to be spawned
         :param func: The target function on which the async calls would be made
         :param args: Arguments for the targeted function
         :param items: iterator of partition
         :param wait: wait until job completes if true, otherwise returns immediately
         """
-        with ThreadPoolExecutor(max_workers=thread_count) as executor:
-            futures = (executor.submit(func, *args, item) for item in items)
-            if wait:
-                result = [future.result() for future in as_completed(futures)]
-                return result
+        futures = [self.producer_executor.submit(func, *args, item) for item in items]
+        if wait:
+            result = [future.result() for future in as_completed(futures)]
+            return result
 
     @staticmethod
     def consumer(thread_count, func):
@@ -3,19 +3,20 @@
 # or more contributor license agreements. Licensed under the Elastic License 2.0;
 # you may not use this file except in compliance with the Elastic License 2.0.
 #
-import multiprocessing
-from multiprocessing.queues import Queue
+from queue import Queue
 
 BATCH_SIZE = 100
 
 
 class ConnectorQueue(Queue):
-    """Class to support additional queue operations specific to the connector"""
+    """Class to support additional queue operations specific to the connector.
+
+    The producers and the consumers are threads of the same process, so the documents
+    are handed over in memory instead of being pickled through a pipe"""
 
     def __init__(self, logger):
-        ctx = multiprocessing.get_context()
         self.logger = logger
-        super(ConnectorQueue, self).__init__(ctx=ctx)
+        super(ConnectorQueue, self).__init__()
 
     def end_signal(self):
         """Send an terminate signal to indicate the queue can be closed"""
@@ -5,10 +5,37 @@
 #
 """This module perform operations related to Enterprise Search based on the Enterprise Search version
 """
+import json
+import os
+import time
+
+import elastic_transport
 from elastic_enterprise_search import WorkplaceSearch, __version__
 from packaging import version
 
 ENTERPRISE_V8 = version.parse("8.0")
+# Last successfully listed permissions, used when they can not be listed
+PERMISSIONS_PATH = os.path.join(os.path.dirname(__file__), "permissions.json")
+# Number of permissions fetched per page when listing the permissions
+PERMISSIONS_PAGE_SIZE = 100
+# Status code of the throttled calls, retried along with the server errors
+THROTTLING_STATUS_CODE = 429
+
+
+def is_transient_error(exception):
+    """Checks whether a failed call to Enterprise Search can succeed when retried
+    :param exception: exception raised by the Enterprise Search client
+    Returns:
+        True for throttling, server and connection errors, False otherwise"""
+    if isinstance(exception, (elastic_transport.ConnectionError, elastic_transport.ConnectionTimeout)):
+        return True
+    # the 7.x clients set the status code on the exception, the 8.x ones on its meta
+    status = getattr(exception, "status", None)
+    if status is None and hasattr(exception, "meta"):
+        status = getattr(exception.meta, "status", None)
+    if not isinstance(status, int):
+        return False
+    return status == THROTTLING_STATUS_CODE or status >= 500
 
 
 class EnterpriseSearchWrapper:
@@ -20,6 +47,7 @@ class EnterpriseSearchWrapper:
         self.host = config.get_value("enterprise_search.host_url")
         self.api_key = config.get_value("workplace_search.api_key")
         self.ws_source = config.get_value("workplace_search.source_id")
+        self.retry_count = config.get_value("retry_count")
         if self.version >= ENTERPRISE_V8:
             if hasattr(args, "user") and args.user:
                 self.workplace_search_client = WorkplaceSearch(
@@ -42,7 +70,7 @@ class EnterpriseSearchWrapper:
                 )
 
     def add_permissions(self, user_name, permission_list):
-        """Add one or more permission for a given user. Permissions are added atop the existing.
+        """Set the permissions of a given user. Permissions replace the existing ones.
         :param user_name: user to assign permissions
         :param permission_list: list of permissions
         """
@@ -74,7 +102,7 @@ class EnterpriseSearchWrapper:
                         permissions=permission_list,
                     )
             else:
-                self.workplace_search_client.add_user_permissions(
+                self.workplace_search_client.put_user_permissions(
                     content_source_id=self.ws_source,
                     user=user_name,
                     body={"permissions": permission_list},
@@ -88,17 +116,35 @@ class EnterpriseSearchWrapper:
             )
 
     def list_permissions(self):
-        """List permissions for one or all users"""
+        """List permissions of all the users, fetching every page of the results
+        Returns:
+            user_permission: list of permissions of the users
+            is_stale: True when the workplace could not be reached and the permissions
+                stored by the last successful listing are returned instead"""
         user_permission = []
+        current_page = 1
         try:
-            if self.version >= ENTERPRISE_V8:
-                user_permission = self.workplace_search_client.list_external_identities(
-                    content_source_id=self.ws_source
-                )
-            else:
-                user_permission = self.workplace_search_client.list_permissions(
-                    content_source_id=self.ws_source,
-                )
+            while True:
+                if self.version >= ENTERPRISE_V8:
+                    response = self.workplace_search_client.list_external_identities(
+                        content_source_id=self.ws_source,
+                        current_page=current_page,
+                        page_size=PERMISSIONS_PAGE_SIZE,
+                    )
+                else:
+                    response = self.workplace_search_client.list_permissions(
+                        content_source_id=self.ws_source,
+                        current_page=current_page,
+                        page_size=PERMISSIONS_PAGE_SIZE,
+                    )
+                results = response.get("results")
+                if not results:
+                    break
+                user_permission.extend(results)
+                total_pages = response.get("meta", {}).get("page", {}).get("total_pages", current_page)
+                if current_page >= total_pages:
+                    break
+                current_page += 1
             self.logger.info(
                 "Successfully retrieves all permissions from the workplace"
             )
@@ -106,20 +152,55 @@ class EnterpriseSearchWrapper:
             self.logger.exception(
                 f"Error while retrieving the permissions from the workplace. Error: {exception}"
             )
+            return self.load_stored_permissions(), True
+        self.store_permissions(user_permission)
+        return user_permission, False
+
+    def store_permissions(self, user_permission):
+        """Stores the listed permissions locally, so they can be used when listing the permissions fails.
+        Failing to store them is only logged, as the listed permissions are still valid
+        :param user_permission: list of permissions of the users
+        """
+        try:
+            with open(PERMISSIONS_PATH, "w", encoding="utf-8") as permissions_file:
+                json.dump(user_permission, permissions_file, indent=4)
+        except (OSError, ValueError) as exception:
+            self.logger.exception(
+                f"Error while updating the permissions json file. Error: {exception}"
+            )
+
+    def load_stored_permissions(self):
+        """Returns the permissions stored by the last successful listing of the permissions"""
+        try:
+            with open(PERMISSIONS_PATH, encoding="utf-8") as permissions_file:
+                user_permission = json.load(permissions_file)
+        except (FileNotFoundError, ValueError) as exception:
+            self.logger.debug(f"No stored permissions could be loaded. Error: {exception}")
+            return []
+        self.logger.warning(
+            f"Serving stale permissions for removal, using the ones stored at {PERMISSIONS_PATH}"
+        )
         return user_permission
 
+    def get_user_name(self, permission):
+        """Returns the name of the user a permission returned by list_permissions belongs to
+        :param permission: dictionary containing permission of perticular user
+        """
+        if self.version >= ENTERPRISE_V8:
+            return permission["external_user_properties"][0]["attribute_value"]
+        return permission["user"]
+
     def remove_permissions(self, permission):
         """Removes one or more permissions from an existing set of permissions
         :param permission: dictionary containing permission of perticular user
         """
         try:
+            user_name = self.get_user_name(permission)
             if self.version >= ENTERPRISE_V8:
-                user_name = permission["external_user_properties"][0]["attribute_value"]
                 self.workplace_search_client.delete_external_identity(
                     content_source_id=self.ws_source, external_user_id=user_name
                 )
             else:
-                user_name = permission["user"]
                 self.workplace_search_client.remove_user_permissions(
                     content_source_id=self.ws_source,
                     user=user_name,
@@ -178,17 +259,25 @@ class EnterpriseSearchWrapper:
 
     def index_documents(self, documents, timeout):
         """Indexes one or more new documents into a custom content source, or updates one
-        or more existing documents
+        or more existing documents. Calls failing with a transient error are retried with
+        an exponential backoff, the other errors are raised right away
         :param documents: list of documents to be indexed
         :param timeout: Timeout in seconds
         """
-        try:
-            responses = self.workplace_search_client.index_documents(
-                content_source_id=self.ws_source,
-                documents=documents,
-                request_timeout=timeout,
-            )
-        except Exception as exception:
-            self.logger.exception(f"Error while indexing the documents. Error: {exception}")
-            raise exception
-        return responses
+        retry = 0
+        while True:
+            try:
+                return self.workplace_search_client.index_documents(
+                    content_source_id=self.ws_source,
+                    documents=documents,
+                    request_timeout=timeout,
+                )
+            except Exception as exception:
+                if retry >= self.retry_count or not is_transient_error(exception):
+                    self.logger.exception(f"Error while indexing the documents. Error: {exception}")
+                    raise exception
+                self.logger.warning(
+                    f"Error while indexing the documents. Retry Count: {retry}. Error: {exception}"
+                )
+                time.sleep(2 ** retry)
+                retry += 1
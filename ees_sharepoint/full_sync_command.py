@@ -7,6 +7,8 @@
 
 It will attempt to sync absolutely all documents that are available in the
 third-party system and ingest them into Enterprise Search instance."""
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
 from .base_command import BaseCommand
@@ -39,32 +41,55 @@ class FullSyncCommand(BaseCommand):
                 start_time,
                 end_time,
                 queue,
+                self.attachment_executor,
             )
             datelist = split_date_range_into_chunks(
                 start_time,
                 end_time,
                 thread_count,
             )
-            for collection in self.config.get_value("sharepoint.site_collections"):
-                storage_with_collection = self.local_storage.get_storage_with_collection(collection)
-                self.logger.info(
-                    "Starting to index all the objects configured in the object field: %s"
-                    % (str(self.config.get_value("objects")))
-                )
-
-                ids = storage_with_collection["global_keys"][collection]
-                storage_with_collection["global_keys"][collection] = sync_sharepoint.fetch_records_from_sharepoint(self.producer, datelist, thread_count, ids, collection)
-
-                queue.put_checkpoint(collection, end_time, "full")
-
-            enterprise_thread_count = self.config.get_value("enterprise_search_sync_thread_count")
-            for _ in range(enterprise_thread_count):
-                queue.end_signal()
+            collections = self.config.get_value("sharepoint.site_collections")
+            # the ids of all the collections are stored together, the storage is loaded once for all of them
+            storage_with_collection = self.local_storage.get_storage_with_collections(collections)
+            # the collections are fetched concurrently, sharing the producer thread pool, so that
+            # its threads are not left idle while a collection waits for its slowest partition
+            with ThreadPoolExecutor(max_workers=thread_count) as executor:
+                futures = [
+                    executor.submit(
+                        self.fetch_collection, sync_sharepoint, datelist, storage_with_collection, collection
+                    )
+                    for collection in collections
+                ]
+                for future in as_completed(futures):
+                    future.result()
         except Exception as exception:
             self.logger.exception(f"Error while fetching the objects . Error {exception}")
             raise exception
+        finally:
+            enterprise_thread_count = self.config.get_value("enterprise_search_sync_thread_count")
+            for _ in range(enterprise_thread_count):
+                queue.end_signal()
         self.local_storage.update_storage(storage_with_collection)
 
+    def fetch_collection(self, sync_sharepoint, datelist, storage_with_collection, collection):
+        """This method fetches the documents of a collection and pushes them in the shared queue,
+        followed by the checkpoint of the collection
+        :param sync_sharepoint: SyncSharepoint object fetching the documents
+        :param datelist: Partition of the time range
+        :param storage_with_collection: Locally stored ids of all the collections
+        :param collection: SharePoint server collection name
+        """
+        thread_count = self.config.get_value("sharepoint_sync_thread_count")
+        self.logger.info(
+            "Starting to index all the objects configured in the object field: %s"
+            % (str(self.config.get_value("objects")))
+        )
+
+        ids = storage_with_collection["global_keys"][collection]
+        storage_with_collection["global_keys"][collection] = sync_sharepoint.fetch_records_from_sharepoint(self.producer, datelist, thread_count, ids, collection)
+
+        sync_sharepoint.queue.put_checkpoint(collection, sync_sharepoint.end_time, "full")
+
     def start_consumer(self, queue):
         """This method starts async calls for the consumer which is responsible for indexing documents to the
         Enterprise Search
@@ -74,10 +99,17 @@ class FullSyncCommand(BaseCommand):
         sync_es = SyncEnterpriseSearch(self.config, self.logger, self.workplace_search_custom_client, queue)
 
         self.consumer(thread_count, sync_es.perform_sync)
+        sync_es.set_checkpoints()
 
     def execute(self):
         """This function execute the start function."""
+        self.create_shared_objects()
         queue = ConnectorQueue(self.logger)
 
-        self.start_producer(queue)
-        self.start_consumer(queue)
+        # documents are indexed while the producer is still fetching the next ones
+        consumer = threading.Thread(target=self.start_consumer, args=(queue,))
+        consumer.start()
+        try:
+            self.start_producer(queue)
+        finally:
+            consumer.join()
@@ -10,6 +10,8 @@ third-party system recently and ingest them into Enterprise Search instance.
 
 Recency is determined by the time when the last successful incremental or full job
 was ran."""
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
 from .base_command import BaseCommand
@@ -33,43 +35,66 @@ class IncrementalSyncCommand(BaseCommand):
 
         thread_count = self.config.get_value("sharepoint_sync_thread_count")
 
-        checkpoint = Checkpoint(self.config, self.logger)
         try:
-            for collection in self.config.get_value("sharepoint.site_collections"):
-                start_time, end_time = checkpoint.get_checkpoint(collection, current_time)
-                sync_sharepoint = SyncSharepoint(
-                    self.config,
-                    self.logger,
-                    self.workplace_search_custom_client,
-                    self.sharepoint_client,
-                    start_time,
-                    end_time,
-                    queue,
-                )
-                datelist = split_date_range_into_chunks(
-                    start_time,
-                    end_time,
-                    thread_count,
-                )
-                storage_with_collection = self.local_storage.get_storage_with_collection(collection)
-                self.logger.info(
-                    "Starting to index all the objects configured in the object field: %s"
-                    % (str(self.config.get_value("objects")))
-                )
-
-                ids = storage_with_collection["global_keys"][collection]
-                storage_with_collection["global_keys"][collection] = sync_sharepoint.fetch_records_from_sharepoint(self.producer, datelist, thread_count, ids, collection)
-
-                queue.put_checkpoint(collection, end_time, "incremental")
-
-            enterprise_thread_count = self.config.get_value("enterprise_search_sync_thread_count")
-            for _ in range(enterprise_thread_count):
-                queue.end_signal()
+            collections = self.config.get_value("sharepoint.site_collections")
+            # the ids of all the collections are stored together, the storage is loaded once for all of them
+            storage_with_collection = self.local_storage.get_storage_with_collections(collections)
+            # the collections are fetched concurrently, sharing the producer thread pool, so that
+            # its threads are not left idle while a collection waits for its slowest partition
+            with ThreadPoolExecutor(max_workers=thread_count) as executor:
+                futures = [
+                    executor.submit(
+                        self.fetch_collection, queue, current_time, storage_with_collection, collection
+                    )
+                    for collection in collections
+                ]
+                for future in as_completed(futures):
+                    future.result()
         except Exception as exception:
             self.logger.exception(f"Error while fetching the objects . Error {exception}")
             raise exception
+        finally:
+            enterprise_thread_count = self.config.get_value("enterprise_search_sync_thread_count")
+            for _ in range(enterprise_thread_count):
+                queue.end_signal()
         self.local_storage.update_storage(storage_with_collection)
 
+    def fetch_collection(self, queue, current_time, storage_with_collection, collection):
+        """This method fetches the documents of a collection changed since its checkpoint and pushes
+        them in the shared queue, followed by the new checkpoint of the collection
+        :param queue: Shared queue to push the fetched documents
+        :param current_time: Current time, end of the time range to be fetched
+        :param storage_with_collection: Locally stored ids of all the collections
+        :param collection: SharePoint server collection name
+        """
+        thread_count = self.config.get_value("sharepoint_sync_thread_count")
+        checkpoint = Checkpoint(self.config, self.logger)
+        start_time, end_time = checkpoint.get_checkpoint(collection, current_time)
+        sync_sharepoint = SyncSharepoint(
+            self.config,
+            self.logger,
+            self.workplace_search_custom_client,
+            self.sharepoint_client,
+            start_time,
+            end_time,
+            queue,
+            self.attachment_executor,
+        )
+        datelist = split_date_range_into_chunks(
+            start_time,
+            end_time,
+            thread_count,
+        )
+        self.logger.info(
+            "Starting to index all the objects configured in the object field: %s"
+            % (str(self.config.get_value("objects")))
+        )
+
+        ids = storage_with_collection["global_keys"][collection]
+        storage_with_collection["global_keys"][collection] = sync_sharepoint.fetch_records_from_sharepoint(self.producer, datelist, thread_count, ids, collection)
+
+        queue.put_checkpoint(collection, end_time, "incremental")
+
     def start_consumer(self, queue):
         """This method starts async calls for the consumer which is responsible for indexing documents to the
         Enterprise Search
@@ -79,10 +104,17 @@ class IncrementalSyncCommand(BaseCommand):
         sync_es = SyncEnterpriseSearch(self.config, self.logger, self.workplace_search_custom_client, queue)
 
         self.consumer(thread_count, sync_es.perform_sync)
+        sync_es.set_checkpoints()
 
     def execute(self):
         """This function execute the start function."""
+        self.create_shared_objects()
         queue = ConnectorQueue(self.logger)
 
-        self.start_producer(queue)
-        self.start_consumer(queue)
+        # documents are indexed while the producer is still fetching the next ones
+        consumer = threading.Thread(target=self.start_consumer, args=(queue,))
+        consumer.start()
+        try:
+            self.start_producer(queue)
+        finally:
+            consumer.join()
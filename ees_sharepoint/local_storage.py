@@ -3,7 +3,6 @@
 # or more contributor license agreements. Licensed under the Elastic License 2.0;
 # you may not use this file except in compliance with the Elastic License 2.0.
 #
-import copy
 import json
 import os
 
@@ -44,24 +43,24 @@ class LocalStorage:
                     f"Error while updating the doc_id json file. Error: {exception}"
                 )
 
-    def get_storage_with_collection(self, collection):
+    def get_storage_with_collections(self, collections):
         """Returns a dictionary containing the locally stored IDs of files fetched from SharePoint
-            :param collection: The SharePoint server collection which is currently being fetched
+            :param collections: The SharePoint server collections which are currently being fetched
         """
         storage_with_collection = {"global_keys": {}, "delete_keys": {}}
         ids_collection = self.load_storage()
-        storage_with_collection["delete_keys"] = copy.deepcopy(
-            ids_collection.get("global_keys")
-        )
-        if not ids_collection["global_keys"].get(collection):
-            ids_collection["global_keys"][collection] = {
-                "sites": {},
-                "lists": {},
-                "list_items": {},
-                "drive_items": {},
-            }
-        storage_with_collection["global_keys"][collection] = copy.deepcopy(
-            ids_collection["global_keys"][collection]
-        )
+        # the loaded ids are not shared with anyone else, only the ids of the collections
+        # need a copy as they are updated by the sync while the delete keys are not
+        storage_with_collection["delete_keys"] = ids_collection.get("global_keys")
+        for collection in collections:
+            collection_ids = ids_collection["global_keys"].get(collection)
+            if not collection_ids:
+                collection_ids = {
+                    "sites": {},
+                    "lists": {},
+                    "list_items": {},
+                    "drive_items": {},
+                }
+            storage_with_collection["global_keys"][collection] = json.loads(json.dumps(collection_ids))
 
         return storage_with_collection
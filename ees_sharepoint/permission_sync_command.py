@@ -9,6 +9,8 @@ It will attempt to remove from Enterprise Search instance the documents
 that have been deleted from the third-party system."""
 import csv
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 from ees_sharepoint.base_command import BaseCommand
 
@@ -45,9 +47,21 @@ class PermissionSyncCommand(BaseCommand):
         self.site_collections = config.get_value("sharepoint.site_collections")
         self.enable_permission = config.get_value("enable_document_permission")
         self.mapping_sheet_path = config.get_value("sharepoint_workplace_user_mapping")
+        self.user_mapping = self.load_user_mapping()
         self.checkpoint = Checkpoint(config, self.logger)
         self.permissions = Permissions(self.sharepoint_client, self.workplace_search_custom_client, self.logger)
 
+    def load_user_mapping(self):
+        """This method returns the mapping of SharePoint users to Workplace Search users
+        read from the mapping sheet, an empty dictionary if no mapping sheet is provided."""
+        rows = {}
+        if self.mapping_sheet_path and os.path.exists(self.mapping_sheet_path) and os.path.getsize(self.mapping_sheet_path) > 0:
+            with open(self.mapping_sheet_path) as file:
+                csvreader = csv.reader(file)
+                for row in csvreader:
+                    rows[row[0]] = row[1]
+        return rows
+
     def get_users_id(self):
         """This method returns the dictionary of dictionaries containing users and their id
         as a key value pair for all the site-collections."""
@@ -67,14 +81,19 @@ class PermissionSyncCommand(BaseCommand):
         return user_ids
 
     def get_user_groups(self, user_ids):
-        """This method returns the groups of each user in all the site-collections
+        """This method returns the groups of each user in all the site-collections.
+        The groups of the users in a site-collection are fetched concurrently.
         :param user_ids: user ids to fetch the groups of the specific user"""
         user_group = {}
+        thread_count = self.config.get_value("sharepoint_sync_thread_count")
         for collection in self.site_collections:
             user_group_collection = {}
             rel_url = f"sites/{collection}/"
-            for name, user_id in user_ids[collection].items():
-                response = self.permissions.fetch_groups(rel_url, user_id)
+            with ThreadPoolExecutor(max_workers=thread_count) as executor:
+                responses = executor.map(
+                    partial(self.permissions.fetch_groups, rel_url), user_ids[collection].values()
+                )
+            for name, response in zip(user_ids[collection].keys(), responses):
                 if response:
                     groups = get_results(self.logger, response.json(), "user_groups")
                     if groups:
@@ -82,24 +101,29 @@ class PermissionSyncCommand(BaseCommand):
             user_group.update({collection: user_group_collection})
         return user_group
 
-    def workplace_add_permission(self, permissions):
+    def workplace_add_permission(self, permissions, indexed_permissions=()):
         """This method when invoked would index the permission provided in the paramater
-        for the user in paramter user_name
-        :param permissions: dictionary of dictionaries containing permissions of all the users in each site-collection."""
+        for the user in paramter user_name. Users whose permissions are already indexed are skipped.
+        :param permissions: dictionary of dictionaries containing permissions of all the users in each site-collection.
+        :param indexed_permissions: permissions already present in the workplace"""
+        user_permissions = {}
+        # a user can have access to multiple site-collections, the permissions are merged
+        # as indexing them replaces the ones indexed previously for the user
         for collection in self.site_collections:
             for user_name, permission_list in permissions[collection].items():
-                self.workplace_search_custom_client.add_permissions(user_name, permission_list)
+                user_permissions.setdefault(user_name, set()).update(permission_list)
+        unchanged_permissions = {
+            self.workplace_search_custom_client.get_user_name(permission): set(permission.get("permissions", []))
+            for permission in indexed_permissions
+        }
+        for user_name, permission_list in user_permissions.items():
+            if unchanged_permissions.get(user_name) == permission_list:
+                continue
+            self.workplace_search_custom_client.add_permissions(user_name, sorted(permission_list))
 
     def sync_permissions(self):
         """This method when invoked, checks the permission of SharePoint users and update those user
         permissions in the Workplace Search."""
-        rows = {}
-        if os.path.exists(self.mapping_sheet_path) and os.path.getsize(self.mapping_sheet_path) > 0:
-            with open(self.mapping_sheet_path) as file:
-                csvreader = csv.reader(file)
-                for row in csvreader:
-                    rows[row[0]] = row[1]
-
         users = self.get_users_id()
         user_names = {}
         user_groups = {}
@@ -107,14 +131,21 @@ class PermissionSyncCommand(BaseCommand):
             for collection in self.site_collections:
                 user_name_collection = {}
                 for user, user_id in users[collection].items():
-                    user_name_collection.update({rows.get(user, user): user_id})
+                    user_name_collection.update({self.user_mapping.get(user, user): user_id})
                 user_names.update({collection: user_name_collection})
             user_groups = self.get_user_groups(user_names)
-            # delete all the permissions present in workplace search
-            self.permissions.remove_all_permissions()
+            # delete the permissions of the users who are not going to be indexed, the
+            # permissions of the other users are replaced when indexing them
+            indexed_permissions, is_stale = self.permissions.remove_all_permissions(
+                excluded_users=[user for collection in user_groups.values() for user in collection],
+                thread_count=self.config.get_value("enterprise_search_sync_thread_count"),
+            )
+            if is_stale:
+                # the stored permissions may not match the workplace, no user is skipped
+                indexed_permissions = ()
             if user_groups:
                 # add all the updated permissions
-                self.workplace_add_permission(user_groups)
+                self.workplace_add_permission(user_groups, indexed_permissions)
 
     def execute(self):
         """Runs the permission indexing logic"""
@@ -8,9 +8,30 @@
 import time
 import requests
 
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
 from requests.exceptions import RequestException
 from requests_ntlm import HttpNtlmAuth
 
+from .utils import json_loads
+
+# Status codes returned by the Sharepoint server when it throttles the requests
+THROTTLING_STATUS_CODES = [429, 503]
+
+
+def get_backoff_time(response, retry):
+    """ Returns the number of seconds to wait before retrying a request, honouring the
+        Retry-After header sent by the Sharepoint server when it throttles the requests
+        :param response: response of the failed call, None if the call raised an exception
+        :param retry: retry count
+        Returns:
+            seconds to wait"""
+    if response is not None and response.status_code in THROTTLING_STATUS_CODES:
+        try:
+            return int(response.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            pass
+    return 2 ** retry
+
 
 class SharePoint:
     """This class encapsulates all module logic."""
@@ -23,12 +44,27 @@ class SharePoint:
         self.password = config.get_value("sharepoint.password")
         self.secure_connection = config.get_value("sharepoint.secure_connection")
         self.certificate_path = config.get_value("sharepoint.certificate_path")
+        if self.secure_connection and self.certificate_path:
+            self.verify = self.certificate_path
+        else:
+            self.verify = self.secure_connection
+        # NTLM authenticates the connection, reusing connections from a single session
+        # avoids the TCP, TLS and NTLM handshakes on every request
+        self.session = requests.Session()
+        self.session.auth = HttpNtlmAuth(self.domain + "\\" + self.username, self.password)
+        # every producer and attachment thread keeps its own connection open instead of
+        # discarding it once more threads than the default pool size are calling the server
+        pool_size = max(DEFAULT_POOLSIZE, 2 * int(config.get_value("sharepoint_sync_thread_count")))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
 
-    def get(self, rel_url, query, param_name):
+    def get(self, rel_url, query, param_name, stream=False):
         """ Invokes a GET call to the Sharepoint server
             :param rel_url: relative url to the sharepoint farm
             :param query: query for passing arguments to the url
             :param param_name: parameter name whether it is sites, lists, list_items, drive_items, permissions or deindex
+            :param stream: whether the body of the response is streamed instead of downloaded at once
             Returns:
                 Response of the GET call"""
         request_headers = {
@@ -46,38 +82,41 @@ class SharePoint:
                 paginate_query = query + f"&$top={top}"
             elif param_name in ["permission_users", "permission_groups", "deindex", "attachment"]:
                 paginate_query = query
-            url = f"{self.host}/{rel_url}{paginate_query}"
+            # the links to the next pages returned by the sharepoint server are absolute
+            if paginate_query.startswith("http"):
+                url = paginate_query
+            else:
+                url = f"{self.host}/{rel_url}{paginate_query}"
             skip += 5000
             retry = 0
-            if self.secure_connection and self.certificate_path:
-                verify = self.certificate_path
-            else:
-                verify = self.secure_connection
             while retry <= self.retry_count:
                 try:
-                    response = requests.get(
+                    response = self.session.get(
                         url,
-                        auth=HttpNtlmAuth(self.domain + "\\" + self.username, self.password),
                         headers=request_headers,
-                        verify=verify,
+                        verify=self.verify,
+                        stream=stream,
                     )
                     if response.ok:
                         if param_name in ["sites", "lists"] and response:
-                            response_data = response.json()
+                            response_data = json_loads(response.content)
                             response_result = response_data.get("d", {}).get("results")
                             response_list["d"]["results"].extend(response_result)
                             if len(response_result) < 5000:
                                 paginate_query = None
                             break
                         if param_name in ["list_items", "drive_items"] and response:
-                            response_data = response.json()
+                            response_data = json_loads(response.content)
                             response_list["d"]["results"].extend(response_data.get("d", {}).get("results"))
                             paginate_query = response_data.get("d", {}).get("__next", False)
                             break
 
                         return response
 
-                    if response.status_code >= 400 and response.status_code < 500:
+                    # the body of a failed response is not read, its connection is released
+                    # here as streamed responses would otherwise hold it
+                    response.close()
+                    if response.status_code >= 400 and response.status_code < 500 and response.status_code not in THROTTLING_STATUS_CODES:
                         if not (param_name == 'deindex' and response.status_code == 404):
                             self.logger.exception(
                                 f"Error: {response.reason}. Error while fetching from the sharepoint, url: {url}."
@@ -88,7 +127,7 @@ class SharePoint:
                     )
                     # This condition is to avoid sleeping for the last time
                     if retry < self.retry_count:
-                        time.sleep(2 ** retry)
+                        time.sleep(get_backoff_time(response, retry))
                     retry += 1
                     paginate_query = None
                     continue
@@ -106,6 +145,61 @@ class SharePoint:
             return response
         return response_list
 
+    def post(self, rel_url, query, data=None, headers=None):
+        """ Invokes a POST call to the Sharepoint server
+            :param rel_url: relative url to the sharepoint farm
+            :param query: query for passing arguments to the url
+            :param data: body of the request
+            :param headers: headers to be sent in addition to the default ones
+            Returns:
+                Response of the POST call"""
+        request_headers = {
+            "accept": "application/json;odata=verbose",
+        }
+        if headers:
+            request_headers.update(headers)
+        url = f"{self.host}/{rel_url}{query}"
+        retry = 0
+        while retry <= self.retry_count:
+            response = None
+            try:
+                response = self.session.post(
+                    url,
+                    headers=request_headers,
+                    data=data,
+                    verify=self.verify,
+                )
+                if response.ok:
+                    return response
+                if response.status_code >= 400 and response.status_code < 500 and response.status_code not in THROTTLING_STATUS_CODES:
+                    self.logger.exception(
+                        f"Error: {response.reason}. Error while posting to the sharepoint, url: {url}."
+                    )
+                    return response
+                self.logger.error(
+                    f"Error while posting to the sharepoint, url: {url}. Retry Count: {retry}. Error: {response.reason}"
+                )
+            except RequestException as exception:
+                self.logger.exception(
+                    f"Error while posting to the sharepoint, url: {url}. Retry Count: {retry}. Error: {exception}"
+                )
+            # This condition is to avoid sleeping for the last time
+            if retry < self.retry_count:
+                time.sleep(get_backoff_time(response, retry))
+            retry += 1
+        return False
+
+    def get_request_digest(self, rel_url):
+        """ Fetches the form digest value required by the Sharepoint server for POST calls
+            :param rel_url: relative url to the sharepoint farm
+            Returns:
+                digest: form digest value, None if it could not be fetched"""
+        response = self.post(rel_url, "_api/contextinfo")
+        if not response or not response.ok:
+            self.logger.error(f"Could not fetch the request digest for url: {rel_url}")
+            return None
+        return json_loads(response.content).get("d", {}).get("GetContextWebInformation", {}).get("FormDigestValue")
+
     @staticmethod
     def get_query(start_time, end_time, param_name):
         """ returns the query for each objects
@@ -20,25 +20,32 @@ class SyncEnterpriseSearch:
         self.logger = logger
         self.workplace_search_custom_client = workplace_search_custom_client
         self.queue = queue
+        # set by any consumer thread failing to index documents, the checkpoints are not advanced
+        # so that the next incremental sync fetches the documents again
+        self.is_error = threading.Event()
+        # checkpoints read from the queue, set once all the consumer threads are done as the documents
+        # fetched before a checkpoint may still be indexed by another consumer thread
+        self.checkpoints = []
+        self.checkpoints_lock = threading.Lock()
 
     def index_documents(self, documents):
         """This method indexes the documents to the Enterprise Search.
         :param documents: documents to be indexed
         """
-        total_documents_indexed = 0
         if documents:
             responses = self.workplace_search_custom_client.index_documents(
                 documents=documents,
                 timeout=CONNECTION_TIMEOUT,
             )
-            for response in responses["results"]:
-                if not response["errors"]:
-                    total_documents_indexed += 1
-                else:
-                    self.logger.error(
-                        "Error while indexing %s. Error: %s"
-                        % (response["id"], response["errors"])
-                    )
+            failed_responses = [response for response in responses["results"] if response["errors"]]
+            if failed_responses:
+                self.is_error.set()
+            for response in failed_responses:
+                self.logger.error(
+                    "Error while indexing %s. Error: %s"
+                    % (response["id"], response["errors"])
+                )
+            total_documents_indexed = len(responses["results"]) - len(failed_responses)
             self.logger.info(
                 f"[{threading.get_ident()}] Successfully indexed {total_documents_indexed} documents to the workplace"
             )
@@ -46,10 +53,10 @@ class SyncEnterpriseSearch:
     def perform_sync(self):
         """Pull documents from the queue and synchronize it to the Enterprise Search."""
         try:
-            checkpoint = Checkpoint(self.config, self.logger)
             signal_open = True
             while signal_open:
                 documents_to_index = []
+                checkpoint_data = None
                 while len(documents_to_index) < BATCH_SIZE:
                     documents = self.queue.get()
                     if documents.get("type") == "signal_close":
@@ -59,11 +66,7 @@ class SyncEnterpriseSearch:
                         signal_open = False
                         break
                     elif documents.get("type") == "checkpoint":
-                        checkpoint.set_checkpoint(
-                            documents.get("data")[0],
-                            documents.get("data")[1],
-                            documents.get("data")[2],
-                        )
+                        checkpoint_data = documents.get("data")
                         break
                     else:
                         documents_to_index.extend(documents.get("data"))
@@ -72,8 +75,31 @@ class SyncEnterpriseSearch:
                 for chunk in split_documents_into_equal_chunks(
                     documents_to_index, BATCH_SIZE
                 ):
-                    self.index_documents(chunk)
+                    try:
+                        self.index_documents(chunk)
+                    except Exception as exception:
+                        self.is_error.set()
+                        self.logger.error(
+                            f"Error while indexing a batch of documents to the Enterprise Search. Error {exception}"
+                        )
+                if checkpoint_data:
+                    with self.checkpoints_lock:
+                        self.checkpoints.append(checkpoint_data)
         except Exception as exception:
+            self.is_error.set()
             self.logger.error(
                 f"Error while indexing the documents to the Enterprise Search. Error {exception}"
             )
+
+    def set_checkpoints(self):
+        """Sets the checkpoints read from the queue, once all the consumer threads are done.
+        They are skipped if any document could not be indexed."""
+        checkpoint = Checkpoint(self.config, self.logger)
+        for collection, checkpoint_time, indexing_type in self.checkpoints:
+            if self.is_error.is_set():
+                self.logger.warning(
+                    "Skipping the checkpoint of the collection %s as some documents could not be indexed",
+                    collection,
+                )
+            else:
+                checkpoint.set_checkpoint(collection, checkpoint_time, indexing_type)
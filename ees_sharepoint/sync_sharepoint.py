@@ -8,6 +8,8 @@
 It's possible to run full syncs and incremental syncs with this module."""
 import os
 import threading
+from functools import partial
+from types import MappingProxyType
 from urllib.parse import urljoin
 
 from dateutil.parser import parse
@@ -15,8 +17,8 @@ from tika.tika import TikaException
 
 from . import adapter
 from .checkpointing import Checkpoint
-from .usergroup_permissions import Permissions
-from .utils import encode, extract, split_documents_into_equal_chunks, split_list_into_buckets
+from .usergroup_permissions import Permissions, Scope
+from .utils import encode, extract_stream, split_documents_into_equal_chunks, split_list_into_buckets
 
 IDS_PATH = os.path.join(os.path.dirname(__file__), "doc_id.json")
 
@@ -28,6 +30,13 @@ LISTS = "lists"
 LIST_ITEMS = "list_items"
 DRIVE_ITEMS = "drive_items"
 
+# Fields used by the connector in addition to the ones of the schema, fetched along with them
+REQUIRED_FIELDS = {
+    SITES: ["Created", "LastItemModifiedDate", "ServerRelativeUrl"],
+    LISTS: ["BaseType", "Id", "LastItemModifiedDate", "ParentWebUrl", "RootFolder/ServerRelativeUrl", "Title"],
+    LIST_ITEMS: ["Attachments", "FileDirRef", "FileRef", "GUID", "HasUniqueRoleAssignments", "Id", "Title"],
+}
+
 
 def get_results(logger, response, entity_name):
     """Attempts to fetch results from a Sharepoint Server response
@@ -58,6 +67,7 @@ class SyncSharepoint:
             start_time,
             end_time,
             queue,
+            attachment_executor,
     ):
         self.config = config
         self.logger = logger
@@ -77,7 +87,20 @@ class SyncSharepoint:
         self.permissions = Permissions(
             self.sharepoint_client, self.workplace_search_custom_client, logger
         )
+        # role assignments of the lists, fetched for the list itself and again for its inheriting items
+        self.list_roles = {}
+        self.list_roles_lock = threading.Lock()
+        # the schemas are shared by all the threads, and may be the default schema itself
+        self.schemas = {
+            document_name: MappingProxyType(self.get_schema_fields(document_name))
+            for document_name in (SITES, LISTS, LIST_ITEMS, DRIVE_ITEMS)
+        }
+        self.select_fields = {
+            document_name: self.get_select_fields(document_name) for document_name in REQUIRED_FIELDS
+        }
         self.queue = queue
+        # shared by all the producer threads, bounding the concurrent attachment downloads
+        self.attachment_executor = attachment_executor
 
     def get_schema_fields(self, document_name):
         """returns the schema of all the include_fields or exclude_fields specified in the configuration file.
@@ -106,6 +129,17 @@ class SyncSharepoint:
             adapter_schema["id"] = field_id
         return adapter_schema
 
+    def get_select_fields(self, document_name):
+        """returns the SharePoint fields to be fetched for the objects, so that the fields
+        not used by the schema are not sent by the server.
+        :param document_name: document name from SITES, LISTS OR LIST_ITEMS
+        Returns:
+            fields: comma separated SharePoint fields
+        """
+        fields = set(self.schemas[document_name].values())
+        fields.update(REQUIRED_FIELDS[document_name])
+        return ",".join(sorted(fields))
+
     def fetch_sites(self, parent_site_url, sites, ids, index, start_time, end_time):
         """This method fetches sites from a collection and invokes the
         index permission method to get the document level permissions.
@@ -121,38 +155,40 @@ class SyncSharepoint:
             documents: response of sharepoint GET call with fields specified in the schema
         """
         rel_url = f"{parent_site_url}/_api/web/webs"
-        self.logger.info("Fetching the sites detail from url: %s" % (rel_url))
+        self.logger.info("Fetching the sites detail from url: %s", rel_url)
         query = self.sharepoint_client.get_query(start_time, end_time, SITES)
+        query += f"&$select={self.select_fields[SITES]}"
         response = self.sharepoint_client.get(rel_url, query, SITES)
         document_list = []
 
         response_data = get_results(self.logger, response, SITES)
         if not response_data:
             self.logger.info(
-                "No sites were created in %s for this interval: start time: %s and end time: %s"
-                % (parent_site_url, start_time, end_time)
+                "No sites were created in %s for this interval: start time: %s and end time: %s",
+                parent_site_url,
+                start_time,
+                end_time,
             )
             return sites, []
         self.logger.info(
-            "Successfully fetched and parsed %s sites response from SharePoint"
-            % len(response_data)
+            "Successfully fetched and parsed %s sites response from SharePoint",
+            len(response_data),
         )
-        schema = self.get_schema_fields(SITES)
+        schema = self.schemas[SITES]
 
         if index:
-            for i, _ in enumerate(response_data):
+            for row in response_data:
                 doc = {"type": SITE}
                 # need to convert date to iso else workplace search throws error on date format Invalid field
                 # value: Value '2021-09-29T08:13:00' cannot be parsed as a date (RFC 3339)"]}
-                response_data[i]["Created"] += "Z"
-                for field, response_field in schema.items():
-                    doc[field] = response_data[i].get(response_field)
+                row["Created"] += "Z"
+                doc.update({field: row.get(response_field) for field, response_field in schema.items()})
                 if self.enable_permission is True:
                     doc["_allow_permissions"] = self.fetch_permissions(
-                        key=SITES, site=response_data[i]["ServerRelativeUrl"]
+                        key=SITES, site=row["ServerRelativeUrl"]
                     )
                 document_list.append(doc)
-                ids["sites"].update({doc["id"]: response_data[i]["ServerRelativeUrl"]})
+                ids["sites"].update({doc["id"]: row["ServerRelativeUrl"]})
         for result in response_data:
             site_server_url = result.get("ServerRelativeUrl")
             sites.update({site_server_url: result.get("LastItemModifiedDate")})
@@ -175,51 +211,57 @@ class SyncSharepoint:
         document = []
         if not sites:
             self.logger.info(
-                "No list was created in this interval: start time: %s and end time: %s"
-                % (self.start_time, self.end_time)
+                "No list was created in this interval: start time: %s and end time: %s",
+                self.start_time,
+                self.end_time,
             )
             return [], [], {}
-        schema_list = self.get_schema_fields(LISTS)
+        schema_list = self.schemas[LISTS]
+        start_time = parse(self.start_time)
         for site_details in sites:
             for site, time_modified in site_details.items():
-                if parse(self.start_time) > parse(time_modified):
+                if start_time > parse(time_modified):
                     continue
                 rel_url = f"{site}/_api/web/lists"
                 self.logger.info(
-                    "Fetching the lists for site: %s from url: %s" % (site, rel_url)
+                    "Fetching the lists for site: %s from url: %s",
+                    site,
+                    rel_url,
                 )
 
                 query = self.sharepoint_client.get_query(
                     self.start_time, self.end_time, LISTS
                 )
+                query += f"&$select={self.select_fields[LISTS]}"
                 response = self.sharepoint_client.get(rel_url, query, LISTS)
 
                 response_data = get_results(self.logger, response, LISTS)
                 if not response_data:
                     self.logger.info(
-                        "No list was created for the site : %s in this interval: start time: %s and end time: %s"
-                        % (site, self.start_time, self.end_time)
+                        "No list was created for the site : %s in this interval: start time: %s and end time: %s",
+                        site,
+                        self.start_time,
+                        self.end_time,
                     )
                     continue
                 self.logger.info(
-                    "Successfully fetched and parsed %s list response for site: %s from SharePoint"
-                    % (len(response_data), site)
+                    "Successfully fetched and parsed %s list response for site: %s from SharePoint",
+                    len(response_data),
+                    site,
                 )
 
                 if index:
-                    if not ids["lists"].get(site):
-                        ids["lists"].update({site: {}})
-                    for i, _ in enumerate(response_data):
+                    list_ids = ids["lists"].setdefault(site, {})
+                    for row in response_data:
                         doc = {"type": LIST}
-                        for field, response_field in schema_list.items():
-                            doc[field] = response_data[i].get(response_field)
-                        relative_url = response_data[i]["RootFolder"].get('ServerRelativeUrl')
+                        doc.update({field: row.get(response_field) for field, response_field in schema_list.items()})
+                        relative_url = row["RootFolder"].get('ServerRelativeUrl')
                         if self.enable_permission is True:
                             doc["_allow_permissions"] = self.fetch_permissions(
                                 key=LISTS,
                                 site=site,
                                 list_id=doc["id"],
-                                list_url=response_data[i]["ParentWebUrl"],
+                                list_url=row["ParentWebUrl"],
                                 itemid=None,
                             )
 
@@ -228,27 +270,27 @@ class SyncSharepoint:
                             relative_url,
                         )
                         document.append(doc)
-                        ids["lists"][site].update(
-                            {doc["id"]: response_data[i]["Title"]}
-                        )
+                        list_ids[doc["id"]] = row["Title"]
 
                 responses.append(response_data)
-            lists = {}
-            libraries = {}
-            for response in responses:
-                for result in response:
-                    if result.get("BaseType") == 1:
-                        libraries[result.get("Id")] = [
-                            result.get("ParentWebUrl"),
-                            result.get("Title"),
-                            result.get("LastItemModifiedDate"),
-                        ]
-                    else:
-                        lists[result.get("Id")] = [
-                            result.get("ParentWebUrl"),
-                            result.get("Title"),
-                            result.get("LastItemModifiedDate"),
-                        ]
+        lists = {}
+        libraries = {}
+        for response in responses:
+            for result in response:
+                if result.get("BaseType") == 1:
+                    libraries[result.get("Id")] = [
+                        result.get("ParentWebUrl"),
+                        result.get("Title"),
+                        result.get("LastItemModifiedDate"),
+                        result.get("RootFolder", {}).get("ServerRelativeUrl"),
+                    ]
+                else:
+                    lists[result.get("Id")] = [
+                        result.get("ParentWebUrl"),
+                        result.get("Title"),
+                        result.get("LastItemModifiedDate"),
+                        result.get("RootFolder", {}).get("ServerRelativeUrl"),
+                    ]
         documents = {"type": LISTS, "data": document}
         return lists, libraries, documents
 
@@ -266,20 +308,21 @@ class SyncSharepoint:
         self.logger.info("Fetching all the items for the lists")
         if not lists:
             self.logger.info(
-                "No item was created in this interval: start time: %s and end time: %s"
-                % (self.start_time, self.end_time)
+                "No item was created in this interval: start time: %s and end time: %s",
+                self.start_time,
+                self.end_time,
             )
         else:
-            for value in lists.values():
-                if not ids["list_items"].get(value[0]):
-                    ids["list_items"].update({value[0]: {}})
-            schema_item = self.get_schema_fields(LIST_ITEMS)
+            schema_item = self.schemas[LIST_ITEMS]
+            start_time = parse(self.start_time)
             for list_content, value in lists.items():
-                if parse(self.start_time) > parse(value[2]):
+                if start_time > parse(value[2]):
                     continue
-                rel_url = f"{value[0]}/_api/web/lists(guid'{list_content}')/items?$select=*,FileRef"
+                rel_url = f"{value[0]}/_api/web/lists(guid'{list_content}')/items?$select={self.select_fields[LIST_ITEMS]}"
                 self.logger.info(
-                    "Fetching the items for list: %s from url: %s" % (value[1], rel_url)
+                    "Fetching the items for list: %s from url: %s",
+                    value[1],
+                    rel_url,
                 )
 
                 query = self.sharepoint_client.get_query(
@@ -290,18 +333,20 @@ class SyncSharepoint:
                 response_data = get_results(self.logger, response, LIST_ITEMS)
                 if not response_data:
                     self.logger.info(
-                        "No item was created for the list %s in this interval: start time: %s and end time: %s"
-                        % (value[1], self.start_time, self.end_time)
+                        "No item was created for the list %s in this interval: start time: %s and end time: %s",
+                        value[1],
+                        self.start_time,
+                        self.end_time,
                     )
                     continue
                 self.logger.info(
-                    "Successfully fetched and parsed %s listitem response for list: %s from SharePoint"
-                    % (len(response_data), value[1])
+                    "Successfully fetched and parsed %s listitem response for list: %s from SharePoint",
+                    len(response_data),
+                    value[1],
                 )
 
                 document = []
-                if not ids["list_items"][value[0]].get(list_content):
-                    ids["list_items"][value[0]].update({list_content: []})
+                item_ids = ids["list_items"].setdefault(value[0], {}).setdefault(list_content, [])
                 rel_url = f"{value[0]}/_api/web/lists(guid'{list_content}')/items?$select=Attachments,AttachmentFiles,Title&$expand=AttachmentFiles"
 
                 file_response_data = self.sharepoint_client.get(
@@ -312,54 +357,82 @@ class SyncSharepoint:
                         self.logger, file_response_data.json(), "attachment"
                     )
 
-                for i, _ in enumerate(response_data):
+                if self.enable_permission is True:
+                    item_permissions = self.fetch_items_permissions(
+                        list_id=list_content,
+                        list_url=value[0],
+                        root_folder=value[3],
+                        items=response_data,
+                        id_field="Id",
+                    )
+                attachment_bodies = self.fetch_attachments(value[0], response_data, file_response_data)
+                for i, row in enumerate(response_data):
                     doc = {"type": ITEM}
-                    if response_data[i].get("Attachments") and file_response_data:
-                        for data in file_response_data:
-                            if response_data[i].get("Title") == data["Title"]:
-                                file_relative_url = data["AttachmentFiles"]["results"][
-                                    0
-                                ]["ServerRelativeUrl"]
-                                url_s = f"{value[0]}/_api/web/GetFileByServerRelativeUrl('{encode(file_relative_url)}')/$value"
-                                response = self.sharepoint_client.get(
-                                    url_s, query="", param_name="attachment"
-                                )
-                                doc["body"] = {}
-                                if response and response.ok:
-                                    try:
-                                        doc["body"] = extract(response.content)
-                                    except TikaException as exception:
-                                        self.logger.error(
-                                            "Error while extracting the contents from the attachment, Error %s"
-                                            % (exception)
-                                        )
-
-                                break
-                    for field, response_field in schema_item.items():
-                        doc[field] = response_data[i].get(response_field)
+                    if i in attachment_bodies:
+                        doc["body"] = attachment_bodies[i]
+                    doc.update({field: row.get(response_field) for field, response_field in schema_item.items()})
                     if self.enable_permission is True:
-                        doc["_allow_permissions"] = self.fetch_permissions(
-                            key=LIST_ITEMS,
-                            list_id=list_content,
-                            list_url=value[0],
-                            itemid=str(response_data[i]["Id"]),
-                        )
-                    relative_url = response_data[i].get("FileRef")
+                        doc["_allow_permissions"] = item_permissions.get(str(row["Id"]), [])
+                    relative_url = row.get("FileRef")
 
                     doc["url"] = urljoin(self.sharepoint_host, relative_url)
 
                     document.append(doc)
-                    if (
-                            response_data[i].get("GUID")
-                            not in ids["list_items"][value[0]][list_content]
-                    ):
-                        ids["list_items"][value[0]][list_content].append(
-                            response_data[i].get("GUID")
-                        )
+                    if row.get("GUID") not in item_ids:
+                        item_ids.append(row.get("GUID"))
                 responses.extend(document)
         documents = {"type": LIST_ITEMS, "data": responses}
         return documents
 
+    def fetch_attachments(self, list_url, items, attachments):
+        """This method fetches and extracts the attachments of the items of a list concurrently,
+        using the attachment thread pool shared by all the producer threads.
+        :param list_url: list url to access the list
+        :param items: items of the list
+        :param attachments: attachment files of the items, matched to the items by title
+        Returns:
+            bodies: dictionary of the extracted attachment contents keyed by the position of the item
+        """
+        if not attachments:
+            return {}
+        attachment_urls = {}
+        for data in attachments:
+            attachment_files = data.get("AttachmentFiles", {}).get("results")
+            if data.get("Attachments") and attachment_files and data.get("Title") not in attachment_urls:
+                attachment_urls[data.get("Title")] = attachment_files[0]["ServerRelativeUrl"]
+        tasks = [
+            (i, attachment_urls[item.get("Title")])
+            for i, item in enumerate(items)
+            if item.get("Attachments") and item.get("Title") in attachment_urls
+        ]
+        if not tasks:
+            return {}
+        bodies = self.attachment_executor.map(
+            partial(self.fetch_and_extract, list_url), [file_relative_url for _, file_relative_url in tasks]
+        )
+        return {i: body for (i, _), body in zip(tasks, bodies)}
+
+    def fetch_and_extract(self, list_url, file_relative_url):
+        """This method fetches an attachment and extracts its contents.
+        :param list_url: list url to access the list
+        :param file_relative_url: server relative url of the attachment
+        Returns:
+            body: extracted contents, an empty dictionary if they could not be extracted
+        """
+        url_s = f"{list_url}/_api/web/GetFileByServerRelativeUrl('{encode(file_relative_url)}')/$value"
+        response = self.sharepoint_client.get(
+            url_s, query="", param_name="attachment", stream=True
+        )
+        if response and response.ok:
+            try:
+                return extract_stream(response)
+            except TikaException as exception:
+                self.logger.error(
+                    "Error while extracting the contents from the attachment, Error %s",
+                    exception,
+                )
+        return {}
+
     def fetch_drive_items(self, libraries, ids):
         """This method fetches items from all the lists in a collection and
         invokes the index permission method to get the document level permissions.
@@ -372,20 +445,21 @@ class SyncSharepoint:
         self.logger.info("Fetching all the files for the library")
         if not libraries:
             self.logger.info(
-                "No file was created in this interval: start time: %s and end time: %s"
-                % (self.start_time, self.end_time)
+                "No file was created in this interval: start time: %s and end time: %s",
+                self.start_time,
+                self.end_time,
             )
         else:
-            schema_drive = self.get_schema_fields(DRIVE_ITEMS)
+            schema_drive = self.schemas[DRIVE_ITEMS]
+            start_time = parse(self.start_time)
             for lib_content, value in libraries.items():
-                if parse(self.start_time) > parse(value[2]):
+                if start_time > parse(value[2]):
                     continue
-                if not ids["drive_items"].get(value[0]):
-                    ids["drive_items"].update({value[0]: {}})
-                rel_url = f"{value[0]}/_api/web/lists(guid'{lib_content}')/items?$select=Modified,Id,GUID,File,Folder&$expand=File,Folder"
+                rel_url = f"{value[0]}/_api/web/lists(guid'{lib_content}')/items?$select=Modified,Id,GUID,File,Folder,FileDirRef,FileRef,HasUniqueRoleAssignments&$expand=File,Folder"
                 self.logger.info(
-                    "Fetching the items for libraries: %s from url: %s"
-                    % (value[1], rel_url)
+                    "Fetching the items for libraries: %s from url: %s",
+                    value[1],
+                    rel_url,
                 )
                 query = self.sharepoint_client.get_query(
                     self.start_time, self.end_time, DRIVE_ITEMS
@@ -394,63 +468,70 @@ class SyncSharepoint:
                 response_data = get_results(self.logger, response, DRIVE_ITEMS)
                 if not response_data:
                     self.logger.info(
-                        "No item was created for the library %s in this interval: start time: %s and end time: %s"
-                        % (value[1], self.start_time, self.end_time)
+                        "No item was created for the library %s in this interval: start time: %s and end time: %s",
+                        value[1],
+                        self.start_time,
+                        self.end_time,
                     )
                     continue
                 self.logger.info(
-                    "Successfully fetched and parsed %s drive item response for library: %s from SharePoint"
-                    % (len(response_data), value[1])
+                    "Successfully fetched and parsed %s drive item response for library: %s from SharePoint",
+                    len(response_data),
+                    value[1],
                 )
                 document = []
-                if not ids["drive_items"][value[0]].get(lib_content):
-                    ids["drive_items"][value[0]].update({lib_content: []})
-                for i, _ in enumerate(response_data):
-                    if response_data[i]["File"].get("TimeLastModified"):
+                item_ids = ids["drive_items"].setdefault(value[0], {}).setdefault(lib_content, [])
+                if self.enable_permission is True:
+                    item_permissions = self.fetch_items_permissions(
+                        list_id=lib_content,
+                        list_url=value[0],
+                        root_folder=value[3],
+                        items=response_data,
+                        id_field="ID",
+                    )
+                for row in response_data:
+                    if row["File"].get("TimeLastModified"):
                         obj_type = "File"
                         doc = {"type": "file"}
-                        file_relative_url = response_data[i]["File"][
+                        file_relative_url = row["File"][
                             "ServerRelativeUrl"
                         ]
                         url_s = f"{value[0]}/_api/web/GetFileByServerRelativeUrl('{encode(file_relative_url)}')/$value"
                         response = self.sharepoint_client.get(
-                            url_s, query="", param_name="attachment"
+                            url_s, query="", param_name="attachment", stream=True
                         )
                         doc["body"] = {}
                         if response and response.ok:
                             try:
-                                doc["body"] = extract(response.content)
+                                doc["body"] = extract_stream(response)
                             except TikaException as exception:
                                 self.logger.error(
-                                    "Error while extracting the contents from the file at %s, Error %s"
-                                    % (response_data[i].get("Url"), exception)
+                                    "Error while extracting the contents from the file at %s, Error %s",
+                                    row.get("Url"),
+                                    exception,
                                 )
                     else:
                         obj_type = "Folder"
                         doc = {"type": "folder"}
-                    for field, response_field in schema_drive.items():
-                        doc[field] = response_data[i][obj_type].get(response_field)
-                    doc["id"] = response_data[i].get("GUID")
+                    obj = row[obj_type]
+                    doc.update({field: obj.get(response_field) for field, response_field in schema_drive.items()})
+                    doc["id"] = row.get("GUID")
                     if self.enable_permission is True:
-                        doc["_allow_permissions"] = self.fetch_permissions(
-                            key=DRIVE_ITEMS,
-                            list_id=lib_content,
-                            list_url=value[0],
-                            itemid=str(response_data[i].get("ID")),
-                        )
+                        doc["_allow_permissions"] = item_permissions.get(str(row.get("ID")), [])
                     doc["url"] = urljoin(
                         self.sharepoint_host,
-                        response_data[i][obj_type]["ServerRelativeUrl"],
+                        row[obj_type]["ServerRelativeUrl"],
                     )
                     document.append(doc)
-                    if doc["id"] not in ids["drive_items"][value[0]][lib_content]:
-                        ids["drive_items"][value[0]][lib_content].append(doc["id"])
+                    if doc["id"] not in item_ids:
+                        item_ids.append(doc["id"])
                 responses.extend(document)
         documents = {"type": DRIVE_ITEMS, "data": responses}
         return documents
 
     def get_roles(self, key, site, list_url, list_id, itemid):
-        """Checks the permissions and returns the user roles.
+        """Checks the permissions and returns the user roles. The roles of a list are
+        fetched once and reused for all its items inheriting them.
         :param key: key, a string value
         :param site: site name to check the permission
         :param list_url: list url to access the list
@@ -461,16 +542,28 @@ class SyncSharepoint:
         """
         if key == SITES:
             rel_url = site
-            roles = self.permissions.fetch_users(key, rel_url)
+            roles = self.permissions.fetch_users(Scope.SITES, rel_url)
 
         elif key == LISTS:
             rel_url = list_url
-            roles = self.permissions.fetch_users(key, rel_url, list_id=list_id)
+            with self.list_roles_lock:
+                roles = self.list_roles.get((rel_url, list_id))
+            if roles is None:
+                roles = self.permissions.fetch_users(Scope.LISTS, rel_url, list_id=list_id)
+                if roles is not None:
+                    with self.list_roles_lock:
+                        self.list_roles[(rel_url, list_id)] = roles
+
+        elif key == LIST_ITEMS:
+            rel_url = list_url
+            roles = self.permissions.fetch_users(
+                Scope.LIST_ITEMS, rel_url, list_id=list_id, item_id=itemid
+            )
 
         else:
             rel_url = list_url
             roles = self.permissions.fetch_users(
-                key, rel_url, list_id=list_id, item_id=itemid
+                Scope.DRIVE_ITEMS, rel_url, list_id=list_id, item_id=itemid
             )
 
         return roles
@@ -501,13 +594,59 @@ class SyncSharepoint:
 
         if not roles:
             return []
-        roles = get_results(self.logger, roles.json(), "roles")
 
         for role in roles:
             title = role["Member"]["Title"]
             groups.append(title)
         return groups
 
+    def fetch_items_permissions(self, list_id, list_url, root_folder, items, id_field):
+        """This method fetches the permissions of multiple items of a list. Items inheriting their
+        permissions from the list, through all their parent folders, get the permissions of the list.
+        The effective permissions of the other items are fetched using batched requests, as they may
+        inherit the unique permissions of a folder.
+        :param list_id: list id to fetch the permission for the items
+        :param list_url: url of the list
+        :param root_folder: server relative url of the root folder of the list
+        :param items: items of the list, as returned by sharepoint
+        :param id_field: name of the field containing the id of an item
+        Returns:
+            groups: dictionary of item id and list of users having access to it
+        """
+        folders = {item.get("FileRef"): item for item in items if item.get("FileRef")}
+        # whether the permissions of a folder are the ones of the list
+        inherits_from_list = {root_folder: True} if root_folder else {}
+
+        def folder_inherits_from_list(folder_url):
+            if folder_url not in inherits_from_list:
+                folder = folders.get(folder_url)
+                # folders not fetched in this interval are not known to inherit from the list
+                if folder is None or folder.get("HasUniqueRoleAssignments", True):
+                    inherits_from_list[folder_url] = False
+                else:
+                    inherits_from_list[folder_url] = folder_inherits_from_list(folder.get("FileDirRef"))
+            return inherits_from_list[folder_url]
+
+        groups = {}
+        fetched_item_ids = []
+        inherited_item_ids = []
+        for item in items:
+            if not item.get("HasUniqueRoleAssignments", True) and folder_inherits_from_list(item.get("FileDirRef")):
+                inherited_item_ids.append(str(item.get(id_field)))
+            else:
+                fetched_item_ids.append(str(item.get(id_field)))
+        if inherited_item_ids:
+            list_groups = self.fetch_permissions(key=LISTS, list_id=list_id, list_url=list_url)
+            for item_id in inherited_item_ids:
+                groups[item_id] = list_groups
+        if fetched_item_ids:
+            roles = self.permissions.fetch_users_batch(
+                list_url, [(list_id, item_id) for item_id in fetched_item_ids]
+            )
+            for (_, item_id), item_roles in roles.items():
+                groups[item_id] = [role["Member"]["Title"] for role in item_roles or []]
+        return groups
+
     def fetch_and_append_sites_to_queue(
             self, ids, collection, duration
     ):
@@ -585,16 +724,19 @@ class SyncSharepoint:
         """
         # Fetch sites
         time_range_list = [(date_ranges[num], date_ranges[num + 1]) for num in range(0, thread_count)]
-        sites = producer(thread_count, self.fetch_and_append_sites_to_queue,
+        sites = producer(self.fetch_and_append_sites_to_queue,
                          [ids, collection], time_range_list, wait=True)
-        all_sites = [{f"/sites/{collection}": self.end_time}]
+        all_sites = {f"/sites/{collection}": self.end_time}
         for site in sites:
-            all_sites.extend(site)
+            for site_details in site:
+                all_sites.update(site_details)
 
-        # Fetch lists
-        partitioned_sites = split_list_into_buckets(all_sites, thread_count)
+        # Fetch lists, one entry per site so that the sites are spread evenly across the threads
+        partitioned_sites = split_list_into_buckets(
+            [{site: time_modified} for site, time_modified in all_sites.items()], thread_count
+        )
 
-        lists = producer(thread_count, self.fetch_and_append_lists_to_queue, [ids], partitioned_sites, wait=True)
+        lists = producer(self.fetch_and_append_lists_to_queue, [ids], partitioned_sites, wait=True)
 
         # Fetch list items
         lists_details, libraries_details = {}, {}
@@ -604,10 +746,10 @@ class SyncSharepoint:
 
         if LIST_ITEMS in self.objects:
             list_items = split_documents_into_equal_chunks(lists_details, thread_count)
-            producer(thread_count, self.fetch_and_append_list_items_to_queue, [ids], list_items, wait=True)
+            producer(self.fetch_and_append_list_items_to_queue, [ids], list_items, wait=True)
 
         # Fetch library details
         if DRIVE_ITEMS in self.objects:
             libraries_items = split_documents_into_equal_chunks(libraries_details, thread_count)
-            producer(thread_count, self.fetch_and_append_drive_items_to_queue, [ids], libraries_items, wait=True)
+            producer(self.fetch_and_append_drive_items_to_queue, [ids], libraries_items, wait=True)
         return ids
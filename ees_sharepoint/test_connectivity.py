@@ -102,13 +102,16 @@ def test_ingestion(settings):
             "type": "list",
         }
     ]
-    workplace_search = WorkplaceSearch(enterprise_search_host)
+    workplace_search = WorkplaceSearch(
+        enterprise_search_host,
+        http_auth=configs.get_value("workplace_search.api_key"),
+    )
     retry = 0
     response = None
     while retry <= retry_count:
         try:
             response = workplace_search.index_documents(
-                http_auth=configs.get_value("workplace_search.api_key"), content_source_id=configs.get_value("workplace_search.source_id"),
+                content_source_id=configs.get_value("workplace_search.source_id"),
                 documents=document,
             )
             print(
@@ -134,9 +137,6 @@ def test_ingestion(settings):
         while retry <= retry_count:
             try:
                 response = workplace_search.delete_documents(
-                    http_auth=configs.get_value(
-                        "workplace_search.api_key"
-                    ),
                     content_source_id=configs.get_value(
                         "workplace_search.source_id"
                     ),
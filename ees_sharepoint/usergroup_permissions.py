@@ -7,11 +7,65 @@
 
 It can be used to fetch user permissions from Sharepoint Server
 or clean permissions in Elastic Enterprise Search"""
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from enum import IntEnum
 
-SITES = "sites"
-LISTS = "lists"
-LIST_ITEMS = "list_items"
-DRIVE_ITEMS = "drive_items"
+from .utils import json_loads
+
+# Maximum number of sub-requests packed in a single $batch request
+BATCH_SIZE = 100
+# Maximum number of role assignments fetched per page
+PAGE_SIZE = 5000
+
+
+class Scope(IntEnum):
+    """Scope of the objects whose role assignments are fetched, used as index of ROLE_ASSIGNMENTS_URLS"""
+    SITES = 0
+    LISTS = 1
+    LIST_ITEMS = 2
+    DRIVE_ITEMS = 3
+
+
+ROLE_ASSIGNMENTS_URLS = (
+    "_api/web/roleassignments?$expand=Member/users,RoleDefinitionBindings",
+    "_api/web/lists(guid'{list_id}')/roleassignments?$expand=Member/users,RoleDefinitionBindings",
+    "_api/web/lists(guid'{list_id}')/items({item_id})/roleassignments?$expand=Member/users,RoleDefinitionBindings",
+    "_api/web/lists(guid'{list_id}')/items({item_id})/roleassignments?$expand=Member/users,RoleDefinitionBindings",
+)
+
+
+def parse_batch_response(response):
+    """ Splits a multipart $batch response into the responses of its sub-requests
+        :param response: response of the $batch POST call
+        Returns:
+            list of (status code, parsed body) tuples in the order of the sub-requests,
+            (None, None) for the parts that could not be parsed
+    """
+    content_type = response.headers.get("content-type", "")
+    boundary = content_type.split("boundary=")[-1].strip('"')
+    results = []
+    for part in response.text.split(f"--{boundary}")[1:]:
+        if part.startswith("--"):
+            break
+        sections = part.strip().replace("\r\n", "\n").split("\n\n", 2)
+        # unparseable parts are kept as failures, so that the results stay aligned with the sub-requests
+        if len(sections) < 2:
+            results.append((None, None))
+            continue
+        status_line = sections[1].split("\n", 1)[0].split(" ")
+        if len(status_line) < 2 or not status_line[1].isdigit():
+            results.append((None, None))
+            continue
+        status_code = int(status_line[1])
+        body = None
+        if status_code == 200 and len(sections) == 3:
+            try:
+                body = json_loads(sections[2])
+            except ValueError:
+                body = None
+        results.append((status_code, body))
+    return results
 
 
 class Permissions:
@@ -22,43 +76,124 @@ class Permissions:
         self.logger = logger
 
     def fetch_users(self, key, rel_url, list_id="", item_id=""):
-        """ Invokes GET calls to fetch unique permissions assigned to an object
-            :param key: object key
+        """ Invokes GET calls to fetch unique permissions assigned to an object,
+            following the links to the next pages until all of them are fetched
+            :param key: scope of the object
             :param rel_url: relative url to the sharepoint farm
             :param list_id: list guid
             :param item_id: item id
             Returns:
-                Response of the GET call
+                roles: list of role assignments, None if they could not be fetched
         """
-        self.logger.info("Fetching the user roles for key: %s" % (key))
-        maps = {
-            SITES: "_api/web/roleassignments?$expand=Member/users,RoleDefinitionBindings",
-            LISTS: f"_api/web/lists(guid\'{list_id}\')/roleassignments?$expand=Member/users,RoleDefinitionBindings",
-            LIST_ITEMS: f"_api/web/lists(guid\'{list_id}\')/items({item_id})/roleassignments?$expand=Member/users,RoleDefinitionBindings",
-            DRIVE_ITEMS: f"_api/web/lists(guid\'{list_id}\')/items({item_id})/roleassignments?$expand=Member/users,RoleDefinitionBindings"
-        }
+        self.logger.info("Fetching the user roles for key: %s", key.name)
+        query = ROLE_ASSIGNMENTS_URLS[key]
+        if key != Scope.SITES:
+            query = query.format(list_id=list_id, item_id=item_id)
+        query = f"{query}&$top={PAGE_SIZE}"
+        if rel_url[-1] != "/":
+            rel_url = rel_url + "/"
+        roles = []
+        while query:
+            response = self.sharepoint_client.get(rel_url, query, "permission_users")
+            if not response:
+                return None
+            response_data = json_loads(response.content).get("d", {})
+            roles.extend(response_data.get("results", []))
+            query = response_data.get("__next")
+        return roles
+
+    def fetch_users_batch(self, rel_url, pairs):
+        """ Invokes $batch POST calls to fetch unique permissions assigned to multiple items,
+            packing up to BATCH_SIZE role assignment GET calls in each request
+            :param rel_url: relative url to the sharepoint farm
+            :param pairs: list of (list guid, item id) tuples
+            Returns:
+                dictionary of role assignments keyed by (list guid, item id), None for the failed ones
+        """
+        self.logger.info("Fetching the user roles for %s items in batches", len(pairs))
         if not rel_url.endswith("/"):
             rel_url = rel_url + "/"
-        return self.sharepoint_client.get(rel_url, maps[key], "permission_users")
+        roles = {pair: None for pair in pairs}
+        if not pairs:
+            return roles
+        digest = self.sharepoint_client.get_request_digest(rel_url)
+        if not digest:
+            return roles
+        for start in range(0, len(pairs), BATCH_SIZE):
+            chunk = pairs[start: start + BATCH_SIZE]
+            boundary = f"batch_{uuid.uuid4()}"
+            body = []
+            for list_id, item_id in chunk:
+                query = ROLE_ASSIGNMENTS_URLS[Scope.LIST_ITEMS].format(list_id=list_id, item_id=item_id)
+                url = f"{self.sharepoint_client.host}/{rel_url}{query}"
+                body.extend([
+                    f"--{boundary}",
+                    "Content-Type: application/http",
+                    "Content-Transfer-Encoding: binary",
+                    "",
+                    f"GET {url} HTTP/1.1",
+                    "accept: application/json;odata=verbose",
+                    "",
+                ])
+            body.extend([f"--{boundary}--", ""])
+            response = self.sharepoint_client.post(
+                rel_url,
+                "_api/$batch",
+                data="\r\n".join(body).encode("utf-8"),
+                headers={
+                    "content-type": f"multipart/mixed; boundary={boundary}",
+                    "X-RequestDigest": digest,
+                },
+            )
+            if not response or not response.ok:
+                self.logger.error("Error while fetching the user roles in batch for url: %s", rel_url)
+                continue
+            for pair, (status_code, result) in zip(chunk, parse_batch_response(response)):
+                if status_code != 200 or result is None:
+                    self.logger.error(
+                        "Error while fetching the user roles for list: %s, item: %s. Status code: %s",
+                        pair[0],
+                        pair[1],
+                        status_code,
+                    )
+                    continue
+                roles[pair] = result.get("d", {}).get("results", [])
+        return roles
 
-    def remove_all_permissions(self):
-        """ Removes all the permissions present in the workplace"""
+    def remove_all_permissions(self, excluded_users=(), thread_count=1):
+        """ Removes all the permissions present in the workplace
+            :param excluded_users: users whose permissions are skipped, as they are going to be replaced
+            :param thread_count: number of threads removing the permissions concurrently
+            Returns:
+                user_permission: permissions present in the workplace before the removal
+                is_stale: True when user_permission may not reflect the workplace
+        """
+        user_permission = []
+        is_stale = True
         try:
-            user_permission = self.workplace_search_custom_client.list_permissions()
+            # all the pages are listed before removing anything, as removing
+            # the permissions while paginating would shift the pages
+            user_permission, is_stale = self.workplace_search_custom_client.list_permissions()
+            excluded_users = set(excluded_users)
+            permission_list = [
+                permission
+                for permission in user_permission
+                if self.workplace_search_custom_client.get_user_name(permission) not in excluded_users
+            ]
 
-            if user_permission:
+            if permission_list:
                 self.logger.info("Removing the permissions from the workplace...")
-                permission_list = user_permission['results']
-                for permission in permission_list:
-                    self.workplace_search_custom_client.remove_permissions(permission)
+                with ThreadPoolExecutor(max_workers=thread_count) as executor:
+                    list(executor.map(self.workplace_search_custom_client.remove_permissions, permission_list))
         except Exception as exception:
-            self.logger.exception("Error while removing the permissions from the workplace. Error: %s" % exception)
+            self.logger.exception("Error while removing the permissions from the workplace. Error: %s", exception)
+        return user_permission, is_stale
 
     def fetch_groups(self, rel_url, userid):
         """ Invokes GET calls to fetch the group roles for a user
             :param rel_url: relative url to the sharepoint farm
             :param userid: user id for fetching the roles
         """
-        self.logger.info("Fetching the group roles for userid: %s" % (userid))
+        self.logger.info("Fetching the group roles for userid: %s", userid)
         return self.sharepoint_client.get(
             rel_url, f"_api/web/GetUserById({userid})/groups", "permission_groups")
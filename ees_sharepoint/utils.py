@@ -5,12 +5,25 @@
 #
 """This module contains uncategorized utility methods."""
 
+import calendar
+import time
 import urllib.parse
-from datetime import datetime
+from itertools import chain, islice
 
 from tika import parser
 
+# orjson parses the large SharePoint responses faster than the json module,
+# which is used when orjson is not installed
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads  # noqa: F401
+
 DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+# Files up to this size are sent to Tika from memory, bigger ones are streamed to it
+BUFFER_MAX_SIZE = 8 * 1024 * 1024
+# Number of bytes read at once from a streamed response
+CHUNK_SIZE = 64 * 1024
 
 
 def extract(content):
@@ -23,6 +36,27 @@ def extract(content):
     return parsed_text
 
 
+def extract_stream(response):
+    """Extracts the contents of a streamed response. Contents up to BUFFER_MAX_SIZE are
+    sent to Tika at once, bigger ones are forwarded chunk by chunk while they are downloaded,
+    without loading all of them in memory. The response is closed once its contents are read
+    :param response: response of a GET call made with stream enabled
+    Returns:
+        parsed_text: parsed text"""
+    try:
+        chunks = response.iter_content(CHUNK_SIZE)
+        buffered = []
+        size = 0
+        for chunk in chunks:
+            buffered.append(chunk)
+            size += len(chunk)
+            if size > BUFFER_MAX_SIZE:
+                return extract(chain(buffered, chunks))
+        return extract(b"".join(buffered))
+    finally:
+        response.close()
+
+
 def encode(object_name):
     """Performs encoding on the name of objects
     containing special characters in their url, and
@@ -56,11 +90,13 @@ def split_documents_into_equal_chunks(documents, chunk_size):
         list_of_chunks: List containing the chunks
     """
     list_of_chunks = []
-    for i in range(0, len(documents), chunk_size):
-        if type(documents) is dict:
-            partitioned_chunk = list(documents.items())[i: i + chunk_size]
-            list_of_chunks.append(dict(partitioned_chunk))
-        else:
+    if type(documents) is dict:
+        # the items are consumed from a single iterator, instead of copying all of them for each chunk
+        items = iter(documents.items())
+        for _ in range(0, len(documents), chunk_size):
+            list_of_chunks.append(dict(islice(items, chunk_size)))
+    else:
+        for i in range(0, len(documents), chunk_size):
             list_of_chunks.append(documents[i: i + chunk_size])
     return list_of_chunks
 
@@ -71,14 +107,13 @@ def split_date_range_into_chunks(start_time, end_time, number_of_threads):
     :param end_time: end time of the interval
     :param number_of_threads: number of threads defined by user in config file
     """
-    start_time = datetime.strptime(start_time, DATETIME_FORMAT)
-    end_time = datetime.strptime(end_time, DATETIME_FORMAT)
+    start_time = calendar.timegm(time.strptime(start_time, DATETIME_FORMAT))
+    end_time = calendar.timegm(time.strptime(end_time, DATETIME_FORMAT))
 
-    diff = (end_time - start_time) / number_of_threads
     datelist = []
     for idx in range(number_of_threads):
-        date_time = start_time + diff * idx
-        datelist.append(date_time.strftime(DATETIME_FORMAT))
-    formatted_end_time = end_time.strftime(DATETIME_FORMAT)
+        date_time = start_time + (end_time - start_time) * idx // number_of_threads
+        datelist.append(time.strftime(DATETIME_FORMAT, time.gmtime(date_time)))
+    formatted_end_time = time.strftime(DATETIME_FORMAT, time.gmtime(end_time))
     datelist.append(formatted_end_time)
     return datelist
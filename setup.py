@@ -24,6 +24,11 @@ install_requires = [
     "cached_property"
 ]
 
+# optional dependencies, used by the connector when they are installed
+extras_require = {
+    "orjson": ["orjson"],
+}
+
 description = ""
 
 with open("README.md") as f:
@@ -54,6 +59,7 @@ setup(
     zip_safe=False,
     classifiers=classifiers,
     install_requires=install_requires,
+    extras_require=extras_require,
     data_files=[("config", ["sharepoint_server_connector.yml"])],
     entry_points="""
       [console_scripts]
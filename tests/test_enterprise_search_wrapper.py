@@ -0,0 +1,67 @@
+#
+# Copyright Elasticsearch B.V. and/or licensed to Elasticsearch B.V. under one
+# or more contributor license agreements. Licensed under the Elastic License 2.0;
+# you may not use this file except in compliance with the Elastic License 2.0.
+#
+import unittest
+import unittest.mock
+
+import elastic_transport
+
+from ees_sharepoint.enterprise_search_wrapper import EnterpriseSearchWrapper, is_transient_error
+
+
+def create_enterprise_search_wrapper():
+    config = unittest.mock.Mock()
+    config.get_value.side_effect = lambda key: {
+        "enterprise_search.host_url": "http://localhost:3002",
+        "workplace_search.api_key": "api_key",
+        "workplace_search.source_id": "source_id",
+        "retry_count": 2,
+    }.get(key)
+    wrapper = EnterpriseSearchWrapper(unittest.mock.Mock(), config, unittest.mock.Mock(user=None))
+    wrapper.workplace_search_client = unittest.mock.Mock()
+    return wrapper
+
+
+class TestEnterpriseSearchWrapper(unittest.TestCase):
+    def test_is_transient_error(self):
+      assert is_transient_error(elastic_transport.ConnectionError("connection refused"))
+      assert is_transient_error(elastic_transport.ConnectionTimeout("timed out"))
+      assert is_transient_error(elastic_transport.TransportError("throttled", status=429))
+      assert is_transient_error(elastic_transport.TransportError("unavailable", status=503))
+      assert is_transient_error(unittest.mock.Mock(spec=["meta"], meta=unittest.mock.Mock(status=502)))
+      assert not is_transient_error(elastic_transport.TransportError("bad request", status=400))
+      assert not is_transient_error(elastic_transport.TransportError("unauthorized", status=401))
+      assert not is_transient_error(ValueError("invalid document"))
+
+    @unittest.mock.patch("time.sleep")
+    def test_index_documents_retries_transient_errors(self, sleep):
+      wrapper = create_enterprise_search_wrapper()
+      wrapper.workplace_search_client.index_documents.side_effect = [
+          elastic_transport.TransportError("unavailable", status=503),
+          {"results": []},
+      ]
+      assert wrapper.index_documents([{"id": "1"}], 10) == {"results": []}
+      assert wrapper.workplace_search_client.index_documents.call_count == 2
+      sleep.assert_called_once_with(1)
+
+    @unittest.mock.patch("time.sleep")
+    def test_index_documents_raises_other_errors(self, sleep):
+      wrapper = create_enterprise_search_wrapper()
+      wrapper.workplace_search_client.index_documents.side_effect = elastic_transport.TransportError(
+          "bad request", status=400
+      )
+      with self.assertRaises(elastic_transport.TransportError):
+          wrapper.index_documents([{"id": "1"}], 10)
+      assert wrapper.workplace_search_client.index_documents.call_count == 1
+      sleep.assert_not_called()
+
+    @unittest.mock.patch("ees_sharepoint.enterprise_search_wrapper.open", side_effect=OSError("read-only file system"))
+    def test_list_permissions_when_storing_fails(self, _):
+      wrapper = create_enterprise_search_wrapper()
+      wrapper.workplace_search_client.list_permissions.return_value = {
+          "results": [{"user": "user", "permissions": ["group"]}],
+          "meta": {"page": {"total_pages": 1}},
+      }
+      assert wrapper.list_permissions() == ([{"user": "user", "permissions": ["group"]}], False)
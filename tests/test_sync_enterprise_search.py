@@ -0,0 +1,40 @@
+#
+# Copyright Elasticsearch B.V. and/or licensed to Elasticsearch B.V. under one
+# or more contributor license agreements. Licensed under the Elastic License 2.0;
+# you may not use this file except in compliance with the Elastic License 2.0.
+#
+import unittest
+import unittest.mock
+from queue import Queue
+
+from ees_sharepoint.sync_enterprise_search import SyncEnterpriseSearch
+
+
+def create_sync_enterprise_search(results):
+    workplace_search_custom_client = unittest.mock.Mock()
+    workplace_search_custom_client.index_documents.return_value = {"results": results}
+    queue = Queue()
+    queue.put({"type": "documents", "data": [{"id": "1"}, {"id": "2"}]})
+    queue.put({"type": "checkpoint", "data": ("collection", "2022-01-02T00:00:00Z", "incremental")})
+    queue.put({"type": "signal_close"})
+    return SyncEnterpriseSearch(unittest.mock.Mock(), unittest.mock.Mock(), workplace_search_custom_client, queue)
+
+
+class TestSyncEnterpriseSearch(unittest.TestCase):
+    @unittest.mock.patch("ees_sharepoint.sync_enterprise_search.Checkpoint")
+    def test_set_checkpoints(self, checkpoint):
+      sync_es = create_sync_enterprise_search([{"id": "1", "errors": []}, {"id": "2", "errors": []}])
+      sync_es.perform_sync()
+      checkpoint.return_value.set_checkpoint.assert_not_called()
+      sync_es.set_checkpoints()
+      checkpoint.return_value.set_checkpoint.assert_called_once_with(
+          "collection", "2022-01-02T00:00:00Z", "incremental"
+      )
+
+    @unittest.mock.patch("ees_sharepoint.sync_enterprise_search.Checkpoint")
+    def test_set_checkpoints_with_rejected_documents(self, checkpoint):
+      sync_es = create_sync_enterprise_search([{"id": "1", "errors": []}, {"id": "2", "errors": ["invalid field"]}])
+      sync_es.perform_sync()
+      sync_es.set_checkpoints()
+      assert sync_es.is_error.is_set()
+      checkpoint.return_value.set_checkpoint.assert_not_called()
@@ -0,0 +1,91 @@
+#
+# Copyright Elasticsearch B.V. and/or licensed to Elasticsearch B.V. under one
+# or more contributor license agreements. Licensed under the Elastic License 2.0;
+# you may not use this file except in compliance with the Elastic License 2.0.
+#
+import unittest
+import unittest.mock
+from concurrent.futures import ThreadPoolExecutor
+
+from ees_sharepoint.sync_sharepoint import SyncSharepoint
+
+
+def create_sync_sharepoint(executor):
+    config = unittest.mock.Mock()
+    config.get_value.side_effect = lambda key: {
+        "objects": {},
+        "enable_document_permission": False,
+        "sharepoint_sync_thread_count": 2,
+    }.get(key)
+    return SyncSharepoint(
+        config,
+        unittest.mock.Mock(),
+        unittest.mock.Mock(),
+        unittest.mock.Mock(),
+        "2022-01-01T00:00:00Z",
+        "2022-01-02T00:00:00Z",
+        unittest.mock.Mock(),
+        executor,
+    )
+
+
+class TestSyncSharepoint(unittest.TestCase):
+    def test_fetch_attachments(self):
+      items = [
+          {"Title": "with attachment", "Attachments": True},
+          {"Title": "without attachment", "Attachments": False},
+          {"Title": "unknown", "Attachments": True},
+      ]
+      attachments = [
+          {"Title": "without attachment", "Attachments": False, "AttachmentFiles": {"results": []}},
+          {
+              "Title": "with attachment",
+              "Attachments": True,
+              "AttachmentFiles": {"results": [{"ServerRelativeUrl": "/first.txt"}]},
+          },
+          {
+              "Title": "with attachment",
+              "Attachments": True,
+              "AttachmentFiles": {"results": [{"ServerRelativeUrl": "/second.txt"}]},
+          },
+      ]
+      with ThreadPoolExecutor(max_workers=2) as executor:
+          sync_sharepoint = create_sync_sharepoint(executor)
+          sync_sharepoint.fetch_and_extract = unittest.mock.Mock(
+              side_effect=lambda list_url, file_relative_url: f"{list_url}{file_relative_url}"
+          )
+          bodies = sync_sharepoint.fetch_attachments("/sites/site", items, attachments)
+      assert bodies == {0: "/sites/site/first.txt"}
+      sync_sharepoint.fetch_and_extract.assert_called_once_with("/sites/site", "/first.txt")
+
+    def test_fetch_attachments_without_attachments(self):
+      sync_sharepoint = create_sync_sharepoint(None)
+      assert sync_sharepoint.fetch_attachments("/sites/site", [{"Title": "item", "Attachments": True}], None) == {}
+
+    def test_fetch_items_permissions(self):
+      root = "/sites/site/Shared Documents"
+      items = [
+          {"ID": 1, "FileRef": f"{root}/root.txt", "FileDirRef": root, "HasUniqueRoleAssignments": False},
+          {"ID": 2, "FileRef": f"{root}/open", "FileDirRef": root, "HasUniqueRoleAssignments": False},
+          {"ID": 3, "FileRef": f"{root}/open/file.txt", "FileDirRef": f"{root}/open", "HasUniqueRoleAssignments": False},
+          {"ID": 4, "FileRef": f"{root}/locked", "FileDirRef": root, "HasUniqueRoleAssignments": True},
+          {"ID": 5, "FileRef": f"{root}/locked/file.txt", "FileDirRef": f"{root}/locked", "HasUniqueRoleAssignments": False},
+          {"ID": 6, "FileRef": f"{root}/old/file.txt", "FileDirRef": f"{root}/old", "HasUniqueRoleAssignments": False},
+      ]
+      sync_sharepoint = create_sync_sharepoint(None)
+      sync_sharepoint.fetch_permissions = unittest.mock.Mock(return_value=["list group"])
+      sync_sharepoint.permissions.fetch_users_batch = unittest.mock.Mock(
+          side_effect=lambda list_url, pairs: {pair: [{"Member": {"Title": f"item {pair[1]}"}}] for pair in pairs}
+      )
+      groups = sync_sharepoint.fetch_items_permissions("list-id", "/sites/site", root, items, "ID")
+      assert groups == {
+          "1": ["list group"],
+          "2": ["list group"],
+          "3": ["list group"],
+          "4": ["item 4"],
+          "5": ["item 5"],
+          "6": ["item 6"],
+      }
+      sync_sharepoint.permissions.fetch_users_batch.assert_called_once_with(
+          "/sites/site", [("list-id", "4"), ("list-id", "5"), ("list-id", "6")]
+      )
@@ -0,0 +1,38 @@
+#
+# Copyright Elasticsearch B.V. and/or licensed to Elasticsearch B.V. under one
+# or more contributor license agreements. Licensed under the Elastic License 2.0;
+# you may not use this file except in compliance with the Elastic License 2.0.
+#
+import unittest
+import unittest.mock
+
+from ees_sharepoint.usergroup_permissions import parse_batch_response
+
+
+class TestUsergroupPermissions(unittest.TestCase):
+    def test_parse_batch_response(self):
+      boundary = "batchresponse_1234"
+      parts = [
+          "Content-Type: application/http\r\nContent-Transfer-Encoding: binary\r\n\r\n"
+          "HTTP/1.1 200 OK\r\nCONTENT-TYPE: application/json;odata=verbose;charset=utf-8\r\n\r\n"
+          '{"d": {"results": [{"Member": {"Title": "user"}}]}}\r\n',
+          "Content-Type: application/http\r\nContent-Transfer-Encoding: binary\r\n\r\n"
+          "HTTP/1.1 404 Not Found\r\nCONTENT-TYPE: application/json;odata=verbose;charset=utf-8\r\n\r\n"
+          '{"error": {"code": "-2130575338"}}\r\n',
+          "Content-Type: application/http\r\n",
+          "Content-Type: application/http\r\nContent-Transfer-Encoding: binary\r\n\r\n"
+          "garbage\r\n\r\n{}\r\n",
+          "Content-Type: application/http\r\nContent-Transfer-Encoding: binary\r\n\r\n"
+          "HTTP/1.1 200 OK\r\nCONTENT-TYPE: application/json;odata=verbose;charset=utf-8\r\n\r\n"
+          '{"d": {"results": []}}\r\n',
+      ]
+      response = unittest.mock.Mock()
+      response.headers = {"content-type": f"multipart/mixed; boundary={boundary}"}
+      response.text = "".join(f"--{boundary}\r\n{part}" for part in parts) + f"--{boundary}--\r\n"
+      assert parse_batch_response(response) == [
+          (200, {"d": {"results": [{"Member": {"Title": "user"}}]}}),
+          (404, None),
+          (None, None),
+          (None, None),
+          (200, {"d": {"results": []}}),
+      ]
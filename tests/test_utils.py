@@ -13,3 +13,40 @@ class TestUtils(unittest.TestCase):
     def test_encode(self):
       encoded_string = utils.encode("some nice object'")
       assert encoded_string == "some%20nice%20object''"
+
+    def test_split_documents_into_equal_chunks(self):
+      documents = {f"id{i}": i for i in range(7)}
+      chunks = utils.split_documents_into_equal_chunks(documents, 3)
+      assert chunks == [
+          {"id0": 0, "id1": 1, "id2": 2},
+          {"id3": 3, "id4": 4, "id5": 5},
+          {"id6": 6},
+      ]
+      assert utils.split_documents_into_equal_chunks(list(range(5)), 2) == [[0, 1], [2, 3], [4]]
+
+    def test_split_date_range_into_chunks(self):
+      datelist = utils.split_date_range_into_chunks("2022-01-01T00:00:00Z", "2022-01-01T00:00:10Z", 3)
+      assert datelist == [
+          "2022-01-01T00:00:00Z",
+          "2022-01-01T00:00:03Z",
+          "2022-01-01T00:00:06Z",
+          "2022-01-01T00:00:10Z",
+      ]
+
+    @unittest.mock.patch("ees_sharepoint.utils.extract")
+    def test_extract_stream(self, extract):
+      response = unittest.mock.Mock()
+      response.iter_content.return_value = iter([b"small ", b"file"])
+      utils.extract_stream(response)
+      extract.assert_called_once_with(b"small file")
+      response.close.assert_called_once()
+
+    @unittest.mock.patch("ees_sharepoint.utils.BUFFER_MAX_SIZE", 4)
+    @unittest.mock.patch("ees_sharepoint.utils.extract")
+    def test_extract_stream_of_large_file(self, extract):
+      extract.side_effect = lambda content: b"".join(content)
+      response = unittest.mock.Mock()
+      response.iter_content.return_value = iter([b"large", b" file", b" content"])
+      assert utils.extract_stream(response) == b"large file content"
+      assert not isinstance(extract.call_args[0][0], bytes)
+      response.close.assert_called_once()